@@ -1,11 +1,24 @@
-from discord import ApplicationContext, Bot, Cog, Member, Option, Permissions, Role, slash_command
-import requests
+import io
+
+from aiohttp import ClientError
+from discord import ApplicationContext, Bot, Cog, File, Member, Option, Permissions, Role, slash_command
+
+from utils.http import http_client
+from utils.watchdog import LoopWatchdog
 
 
 class Admin(Cog):
     def __init__(self, bot: Bot, allowed_users: set[int]):
         self.bot = bot
         self.allowed_users = allowed_users
+        self.watchdog = LoopWatchdog()
+
+    @Cog.listener()
+    async def on_ready(self) -> None:
+        self.watchdog.start()
+
+    def cog_unload(self) -> None:
+        self.watchdog.stop()
 
     def is_allowed(self, ctx: ApplicationContext) -> bool:
         return ctx.author.id in self.allowed_users
@@ -75,15 +88,63 @@ class Admin(Cog):
             await ctx.respond("You are not authorized to use this command.", ephemeral=True)
             return
 
-        response = requests.get("https://icanhazip.com")
-
-        if not response.ok:
+        try:
+            ip_address = (await http_client.get_text("https://icanhazip.com")).strip()
+        except (ClientError, TimeoutError):
             await ctx.respond("Failed to get IP address.")
             return
 
-        ip_address = response.text.strip()
         await ctx.respond(f"External IP Address: `{ip_address}`")
 
+    @slash_command(description="Show event loop lag and recently captured blocking calls")
+    async def loop_lag(
+        self,
+        ctx: ApplicationContext,
+    ) -> None:
+        if not self.is_allowed(ctx):
+            await ctx.respond("You are not authorized to use this command.", ephemeral=True)
+            return
+
+        summary = (
+            f"Event loop lag: current `{self.watchdog.current_lag * 1000:.1f} ms`, "
+            f"mean `{self.watchdog.mean_lag * 1000:.1f} ms`, max `{self.watchdog.max_lag * 1000:.1f} ms`. "
+            f"{len(self.watchdog.stalls)} stall{"s" if len(self.watchdog.stalls) != 1 else ""} captured."
+        )
+
+        if not self.watchdog.stalls:
+            await ctx.respond(summary)
+            return
+
+        stalls = io.BytesIO(self.watchdog.format_stalls().encode())
+        await ctx.respond(summary, file=File(stalls, filename="stalls.txt"))
+
+    @slash_command(description="Profile the bot for a number of seconds and attach the results")
+    async def profile(
+        self,
+        ctx: ApplicationContext,
+        mode: Option(str, description="What to profile", choices=["cpu", "memory"]) = "cpu",
+        seconds: Option(float, description="Duration of the profiling session", min_value=1.0, max_value=120.0) = 10.0,
+    ) -> None:
+        if not self.is_allowed(ctx):
+            await ctx.respond("You are not authorized to use this command.", ephemeral=True)
+            return
+
+        if self.watchdog.profiling:
+            await ctx.respond("A profiling session is already running.", ephemeral=True)
+            return
+
+        await ctx.defer()
+
+        if mode == "memory":
+            report = await self.watchdog.profile_memory(seconds)
+        else:
+            report = await self.watchdog.profile_cpu(seconds)
+
+        await ctx.respond(
+            f"Finished {mode} profiling session of {seconds:.1f} s.",
+            file=File(io.BytesIO(report.encode()), filename=f"{mode}_profile.txt")
+        )
+
 
 def setup(bot: Bot) -> None:
     bot.add_cog(Admin(bot, {272079853954531339}))
@@ -1,22 +1,30 @@
 import asyncio
 from collections import deque
+from itertools import islice
+import json
 import logging
-from operator import itemgetter
 import os
 from pathlib import Path
 from queue import Empty, Queue
 import random
 import re
-from threading import Thread, Event
-from typing import Callable, Generator, Iterable
+import sys
+from threading import Event, Lock, Thread
+import time
+from typing import Callable, Coroutine, Generator, Iterator, TypeVar
 
+from aiohttp import BasicAuth, ClientResponseError
 from discord import ApplicationContext, Bot, Cog, FFmpegPCMAudio, Option, VoiceClient, slash_command
 from discord.channel import VocalGuildChannel
+from discord.ext import tasks
 from dotenv import load_dotenv
-import spotipy
-from spotipy import SpotifyClientCredentials
 from yt_dlp import YoutubeDL
 
+from utils.http import http_client
+from utils.outbound import message_scheduler
+
+T = TypeVar("T")
+
 
 class Spotify:
     TRACK_URL_REGEX = re.compile(r"(https?://)?(www\.)?open\.spotify\.com/track/([a-zA-Z0-9]+)")
@@ -24,11 +32,57 @@ class Spotify:
     ALBUM_URL_REGEX = re.compile(r"(https?://)?(www\.)?open\.spotify\.com/album/([a-zA-Z0-9]+)")
     ARTIST_URL_REGEX = re.compile(r"(https?://)?(www\.)?open\.spotify\.com/artist/([a-zA-Z0-9]+)")
     
+    TOKEN_URL = "https://accounts.spotify.com/api/token"
+    API_URL = "https://api.spotify.com/v1"
+
     load_dotenv()
-    _sp = spotipy.Spotify(
-        auth_manager=SpotifyClientCredentials()
-    )
-    
+    _client_id = os.getenv("SPOTIPY_CLIENT_ID")
+    _client_secret = os.getenv("SPOTIPY_CLIENT_SECRET")
+    _access_token: str | None = None
+    _access_token_expires_at = 0.0
+    _access_token_lock = asyncio.Lock()
+
+    @classmethod
+    async def _get_access_token(cls) -> str:
+        async with cls._access_token_lock:
+            if cls._access_token is not None and time.monotonic() < cls._access_token_expires_at:
+                return cls._access_token
+
+            if cls._client_id is None or cls._client_secret is None:
+                raise RuntimeError("SPOTIPY_CLIENT_ID and SPOTIPY_CLIENT_SECRET are not set in .env file")
+
+            token = await http_client.post_json(
+                cls.TOKEN_URL,
+                data={"grant_type": "client_credentials"},
+                auth=BasicAuth(cls._client_id, cls._client_secret)
+            )
+            cls._access_token = token["access_token"]
+            cls._access_token_expires_at = time.monotonic() + token["expires_in"] - 60
+
+            return cls._access_token
+
+    @classmethod
+    async def _get(cls, url: str, **params: str) -> dict:
+        headers = {"Authorization": f"Bearer {await cls._get_access_token()}"}
+
+        try:
+            return await http_client.get_json(url, params=params, headers=headers)
+        except ClientResponseError as e:
+            if e.status in (400, 404):
+                raise ValueError(f"Invalid Spotify resource: {url}") from e
+            raise
+
+    @classmethod
+    async def _get_all_items(cls, url: str) -> list[dict]:
+        page = await cls._get(url)
+        items = page["items"]
+
+        while page.get("next"):
+            page = await cls._get(page["next"])
+            items.extend(page["items"])
+
+        return items
+
     @staticmethod
     def _track_to_title(track: dict) -> str:
         artist = track["artists"][0]["name"]
@@ -37,36 +91,28 @@ class Spotify:
         return f"{artist} - {name}"
 
     @classmethod
-    def track_to_title(cls, track_id: str) -> str:
-        track = cls._sp.track(track_id)
-        if track == None:
-            raise ValueError("Invalid track id")
+    async def track_to_title(cls, track_id: str) -> str:
+        track = await cls._get(f"{cls.API_URL}/tracks/{track_id}")
 
         return Spotify._track_to_title(track)
 
     @classmethod
-    def playlist_to_titles(cls, playlist_id: str) -> tuple[str, ...]:
-        playlist = cls._sp.playlist_tracks(playlist_id)
-        if playlist is None:
-            raise ValueError("Invalid playlist id")
-        
-        return tuple(Spotify._track_to_title(item["track"]) for item in playlist["items"])
+    async def playlist_to_titles(cls, playlist_id: str) -> tuple[str, ...]:
+        items = await cls._get_all_items(f"{cls.API_URL}/playlists/{playlist_id}/tracks")
+
+        return tuple(Spotify._track_to_title(item["track"]) for item in items if item["track"])
 
     @classmethod
-    def album_to_titles(cls, album_id: str) -> tuple[str, ...]:
-        album = cls._sp.album_tracks(album_id)
-        if album is None:
-            raise ValueError("Invalid album id")
-        
-        return tuple(Spotify._track_to_title(track) for track in album["items"])
+    async def album_to_titles(cls, album_id: str) -> tuple[str, ...]:
+        tracks = await cls._get_all_items(f"{cls.API_URL}/albums/{album_id}/tracks")
+
+        return tuple(Spotify._track_to_title(track) for track in tracks)
 
     @classmethod
-    def artist_to_titles(cls, artist_id: str) -> tuple[str, ...]:
-        album = cls._sp.artist_top_tracks(artist_id)
-        if album is None:
-            raise ValueError("Invalid artist id")
-        
-        return tuple(Spotify._track_to_title(track) for track in album["tracks"])
+    async def artist_to_titles(cls, artist_id: str) -> tuple[str, ...]:
+        top_tracks = await cls._get(f"{cls.API_URL}/artists/{artist_id}/top-tracks", market="US")
+
+        return tuple(Spotify._track_to_title(track) for track in top_tracks["tracks"])
 
 
 class Youtube:
@@ -105,18 +151,81 @@ class Youtube:
             return (entry["id"] for entry in result["entries"])
 
     @classmethod
-    def download(cls, video_ids: Iterable[str], download_dir: Path) -> None:
+    def download_with_metadata(cls, video_id: str, download_dir: Path) -> dict | None:
         with YoutubeDL(cls.DOWNLOAD_OPTIONS | {"paths": {"home": str(download_dir)}}) as ydl:
-            urls = [f"https://www.youtube.com/watch?v={video_id}" for video_id in video_ids]
-            logging.info(f"Downlading {urls} to {download_dir}.")
-            ydl.download(urls)
+            url = f"https://www.youtube.com/watch?v={video_id}"
+            logging.info(f"Downlading {url} to {download_dir}.")
+            info = ydl.extract_info(url, download=True)
+
+        if info is None:
+            return None
+
+        return {
+            "id": info["id"],
+            "title": info.get("title"),
+            "duration": info.get("duration"),
+        }
+
+
+class Track:
+    # Tracks are shared by reference between the FileCache index and every guild's queue
+    __slots__ = ("video_id", "path", "title", "duration_seconds", "size_bytes")
+
+    def __init__(
+        self,
+        video_id: str,
+        path: Path,
+        title: str,
+        duration_seconds: float | None,
+        size_bytes: int
+    ):
+        self.video_id = video_id
+        self.path = path
+        self.title = sys.intern(title)
+        self.duration_seconds = duration_seconds
+        self.size_bytes = size_bytes
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Track) and self.video_id == other.video_id
+
+    def __hash__(self) -> int:
+        return hash(self.video_id)
+
+    def __str__(self) -> str:
+        return self.title
+
+    def to_dict(self) -> dict:
+        return {
+            "video_id": self.video_id,
+            "path": str(self.path),
+            "title": self.title,
+            "duration_seconds": self.duration_seconds,
+            "size_bytes": self.size_bytes,
+        }
+
+    @classmethod
+    def from_dict(cls, track: dict) -> "Track":
+        return cls(
+            track["video_id"],
+            Path(track["path"]),
+            track["title"],
+            track.get("duration_seconds"),
+            track.get("size_bytes", 0)
+        )
 
 
 class FileCache:
     CACHE_DIR = Path("./audio_cache")
     CACHE_MAX_SIZE = 8 * 1024 ** 3
+    METADATA_DIR = Path("./audio_cache_metadata")  # Kept outside CACHE_DIR so it is never evicted
+    VIDEO_ID_REGEX = re.compile(r"\[([a-zA-Z0-9_-]{11})\]$")  # Matches the "[%(id)s]" suffix of Youtube.DOWNLOAD_OPTIONS
 
     CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    METADATA_DIR.mkdir(parents=True, exist_ok=True)
+
+    _evict_lock = Lock()
+    _tracks: dict[str, Track] = {}
+    _tracks_lock = Lock()
     
     @classmethod
     def _get_files(cls, pattern: str = "*") -> tuple[Path, ...]:
@@ -140,12 +249,21 @@ class FileCache:
 
     @classmethod
     def _evict_least_recently_used(cls) -> None:
-        cls._get_least_recently_used_file().unlink()
+        file = cls._get_least_recently_used_file()
+        file.unlink()
+
+        video_id = cls.VIDEO_ID_REGEX.search(file.stem)
+        if video_id is not None:
+            cls.remove_metadata(video_id[1])
+
+            with cls._tracks_lock:
+                cls._tracks.pop(video_id[1], None)
 
     @classmethod
     def evict_cache(cls) -> None:
-        while cls._should_evict():
-            cls._evict_least_recently_used()
+        with cls._evict_lock:
+            while cls._should_evict():
+                cls._evict_least_recently_used()
 
     @staticmethod
     def update_timestamp(file: Path) -> None:
@@ -158,10 +276,92 @@ class FileCache:
             cls.update_timestamp(file)
             return file
 
+    # One file per video id so the bot and warmup, running as separate processes, never overwrite each other
+    @classmethod
+    def _get_metadata_path(cls, video_id: str) -> Path:
+        return cls.METADATA_DIR / f"{video_id}.json"
+
+    @classmethod
+    def get_metadata(cls, video_id: str) -> dict | None:
+        try:
+            return json.loads(cls._get_metadata_path(video_id).read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    @classmethod
+    def store_metadata(cls, video_id: str, metadata: dict) -> None:
+        path = cls._get_metadata_path(video_id)
+        temporary_path = path.with_suffix(f".{os.getpid()}.tmp")
+        temporary_path.write_text(json.dumps(metadata))
+        temporary_path.replace(path)
+
+    @classmethod
+    def remove_metadata(cls, video_id: str) -> None:
+        cls._get_metadata_path(video_id).unlink(missing_ok=True)
+
+    @classmethod
+    def register_track(cls, track: Track) -> Track:
+        with cls._tracks_lock:
+            existing = cls._tracks.get(track.video_id)
+            if existing is not None and existing.path.is_file():
+                return existing
+
+            cls._tracks[track.video_id] = track
+            return track
+
+    @classmethod
+    def get_track(cls, video_id: str) -> Track | None:
+        track = cls._tracks.get(video_id)
+        if track is not None and track.path.is_file():
+            cls.update_timestamp(track.path)
+            return track
+
+        file = cls.get_file(fr"*{video_id}*")
+        if file is None:
+            return None
+
+        # Files downloaded before the metadata index existed only have their title in the filename
+        metadata = cls.get_metadata(video_id) or {}
+        title = metadata.get("title") or file.stem.rsplit(' ', maxsplit=1)[0]
+
+        return cls.register_track(Track(video_id, file, title, metadata.get("duration"), file.stat().st_size))
+
 
 class AudioFetcher:
+    RUN_ON_LOOP_TIMEOUT_SECONDS = 60.0
+
+    @staticmethod
+    def _run_on_loop(coroutine: Coroutine[None, None, T], loop: asyncio.AbstractEventLoop) -> T:
+        # Called from the query worker thread, runs the coroutine on the bot's event loop and waits for it.
+        # Bounded so stopping playback, which joins the worker thread, never hangs on a slow request.
+        future = asyncio.run_coroutine_threadsafe(coroutine, loop)
+        try:
+            return future.result(timeout=AudioFetcher.RUN_ON_LOOP_TIMEOUT_SECONDS)
+        except TimeoutError:
+            future.cancel()
+            raise
+
+    @staticmethod
+    async def expand_collection(query: str) -> list[str]:
+        # Splits Spotify collections into one search query per track so they can be resolved in parallel
+        spotify_playlist = Spotify.PLAYLIST_URL_REGEX.match(query)
+        spotify_album = Spotify.ALBUM_URL_REGEX.match(query)
+        spotify_artist = Spotify.ARTIST_URL_REGEX.match(query)
+
+        if spotify_playlist:
+            return list(await Spotify.playlist_to_titles(spotify_playlist[3]))
+
+        if spotify_album:
+            return list(await Spotify.album_to_titles(spotify_album[3]))
+
+        if spotify_artist:
+            return list(await Spotify.artist_to_titles(spotify_artist[3]))
+
+        return [query]
+
     @staticmethod
-    def _search(query: str) -> Generator[str, None, None]:
+    def search(query: str, loop: asyncio.AbstractEventLoop, skip: int = 0) -> Iterator[str]:
+        # skip resumes a partially resolved query without searching the results that were already resolved
         youtube_playlist = Youtube.PLAYLIST_URL_REGEX.match(query)
         youtube_video = Youtube.VIDEO_URL_REGEX.match(query)
 
@@ -170,15 +370,18 @@ class AudioFetcher:
         spotify_album = Spotify.ALBUM_URL_REGEX.match(query)
         spotify_artist = Spotify.ARTIST_URL_REGEX.match(query)
 
+        if skip and not (youtube_playlist or spotify_playlist or spotify_album or spotify_artist):
+            return iter(())
+
         if youtube_playlist:
-            return Youtube.fast_search(query)
+            return islice(Youtube.fast_search(query), skip, None)
 
         if youtube_video:
             return (id for id in (youtube_video[4],))
 
         if spotify_track:
             track_id = spotify_track[3]
-            track_title = Spotify.track_to_title(track_id)
+            track_title = AudioFetcher._run_on_loop(Spotify.track_to_title(track_id), loop)
             url = "ytsearch1:" + track_title
 
             return Youtube.fast_search(url)
@@ -188,7 +391,7 @@ class AudioFetcher:
 
             return (
                 next(Youtube.fast_search("ytsearch1:" + title))
-                for title in Spotify.playlist_to_titles(playlist_id)
+                for title in AudioFetcher._run_on_loop(Spotify.playlist_to_titles(playlist_id), loop)[skip:]
             )
 
         if spotify_album:
@@ -196,7 +399,7 @@ class AudioFetcher:
 
             return (
                 next(Youtube.fast_search("ytsearch1:" + title))
-                for title in Spotify.album_to_titles(album_id)
+                for title in AudioFetcher._run_on_loop(Spotify.album_to_titles(album_id), loop)[skip:]
             )
 
         if spotify_artist:
@@ -204,41 +407,138 @@ class AudioFetcher:
 
             return (
                 next(Youtube.fast_search("ytsearch1:" + title))
-                for title in Spotify.artist_to_titles(artist_id)
+                for title in AudioFetcher._run_on_loop(Spotify.artist_to_titles(artist_id), loop)[skip:]
             )
 
         return Youtube.fast_search("ytsearch1:" + query)
 
     @staticmethod
-    def get_files_and_titles(query: str) -> Generator[tuple[Path, str], None, None]:
-        video_ids = AudioFetcher._search(query)
-        
-        for video_id in video_ids:
-            file_pattern = fr"*{video_id}*"
+    def fetch(video_id: str) -> Path | None:
+        file_pattern = fr"*{video_id}*"
+        file = FileCache.get_file(file_pattern)
+
+        if file is None:
+            metadata = Youtube.download_with_metadata(video_id, FileCache.CACHE_DIR)
+            if metadata is not None:
+                FileCache.store_metadata(video_id, metadata)
+
+            FileCache.evict_cache()
             file = FileCache.get_file(file_pattern)
 
-            if file is None:
-                Youtube.download((video_id,), FileCache.CACHE_DIR)
-                FileCache.evict_cache()
-                file = FileCache.get_file(file_pattern)
+        return file
+
+    @staticmethod
+    def get_tracks(
+        query: str,
+        loop: asyncio.AbstractEventLoop,
+        skip: int = 0
+    ) -> Generator[tuple[int, Track], None, None]:
+        # Yields each track with its position in the query's results so callers can track progress
+        video_ids = AudioFetcher.search(query, loop, skip)
+        
+        for position, video_id in enumerate(video_ids, skip):
+            track = FileCache.get_track(video_id)
+
+            if track is None and AudioFetcher.fetch(video_id) is not None:
+                track = FileCache.get_track(video_id)
+
+            if track is None:
+                continue
+
+            yield position, track
+
+
+class PlaybackSnapshots:
+    SNAPSHOT_DIR = Path("./playback_snapshots")
+    POSITION_SUFFIX = ".position.json"
+
+    SNAPSHOT_DIR.mkdir(parents=True, exist_ok=True)
+
+    # The queue changes rarely and can be long, the position changes constantly and is tiny,
+    # so they are stored separately and only the part that changed gets rewritten.
+    @classmethod
+    def _get_queue_path(cls, guild_id: int) -> Path:
+        return cls.SNAPSHOT_DIR / f"{guild_id}.json"
+
+    @classmethod
+    def _get_position_path(cls, guild_id: int) -> Path:
+        return cls.SNAPSHOT_DIR / f"{guild_id}{cls.POSITION_SUFFIX}"
+
+    @staticmethod
+    def _write(path: Path, content: dict) -> None:
+        temporary_path = path.with_suffix(".tmp")
+        temporary_path.write_text(json.dumps(content))
+        temporary_path.replace(path)
+
+    @classmethod
+    def save_queue(cls, guild_id: int, snapshot: dict) -> None:
+        cls._write(cls._get_queue_path(guild_id), snapshot)
+
+    @classmethod
+    def save_position(cls, guild_id: int, position: dict) -> None:
+        cls._write(cls._get_position_path(guild_id), position)
+
+    @classmethod
+    def delete(cls, guild_id: int) -> None:
+        cls._get_queue_path(guild_id).unlink(missing_ok=True)
+        cls._get_position_path(guild_id).unlink(missing_ok=True)
+
+    @classmethod
+    def _load(cls, guild_id: int) -> dict:
+        snapshot = json.loads(cls._get_queue_path(guild_id).read_text())
+        snapshot["position_seconds"] = 0.0
+
+        try:
+            position = json.loads(cls._get_position_path(guild_id).read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return snapshot
+
+        # The position is only valid for the track that was playing when it was written
+        snapshot["saved_at"] = max(snapshot["saved_at"], position["saved_at"])
+        if snapshot["queue"] and snapshot["queue"][0]["video_id"] == position["video_id"]:
+            snapshot["position_seconds"] = position["position_seconds"]
 
-            if file is None:
+        return snapshot
+
+    @classmethod
+    def load_all(cls) -> dict[int, dict]:
+        snapshots = {}
+        for path in cls.SNAPSHOT_DIR.glob("*.json"):
+            if path.name.endswith(cls.POSITION_SUFFIX):
                 continue
 
-            title = file.stem.rsplit(' ', maxsplit=1)[0]
+            try:
+                guild_id = int(path.stem)
+                snapshots[guild_id] = cls._load(guild_id)
+            except (ValueError, KeyError, json.JSONDecodeError):
+                logging.warning(f"Discarding unreadable playback snapshot {path}")
+                path.unlink(missing_ok=True)
 
-            yield (file, title)
+        return snapshots
 
 
 class PlaybackInstance:
     GREETING_AUDIO_PATH = Path("./assets/audio/obi_wan_hello_there.mp3")
+    IDLE_GRACE_SECONDS = 300.0
 
-    def __init__(self, voice_client: VoiceClient, on_finished: Callable[[], None] | None = None):
+    def __init__(
+        self,
+        voice_client: VoiceClient,
+        on_finished: Callable[[], None] | None = None,
+        idle_grace_seconds: float = IDLE_GRACE_SECONDS
+    ):
         self._voice_client = voice_client
         self._on_finished = on_finished
-        self._audio_queue: deque[tuple[Path, str]] = deque()
-        self._query_queue: Queue[str] = Queue()
+        self._idle_grace_seconds = idle_grace_seconds
+        self._idle_timer: asyncio.TimerHandle | None = None
+        self._stop_task: asyncio.Task | None = None
+        self._audio_queue: deque[Track] = deque()
+        self._query_queue: Queue[tuple[str, int]] = Queue()  # (query, number of results to skip)
+        self._in_flight_query: list | None = None  # [query, results resolved so far] while the worker resolves it
         self._stop_query_worker = Event()
+        self._track_offset_seconds = 0.0
+        self._track_started_at: float | None = None
+        self.version = 0  # Bumped whenever the queue changes, used to skip redundant snapshots
 
         try:
             self._loop = asyncio.get_running_loop()
@@ -248,9 +548,11 @@ class PlaybackInstance:
         self._query_worker_td: Thread
         self._start_query_worker()
 
-    async def _enqueue_audio(self, file_path: Path, title: str) -> None:
-        logging.debug(f"Queueing {title}")
-        self._audio_queue.append((file_path, title))
+    async def _enqueue_audio(self, track: Track, in_flight_query: list, position: int) -> None:
+        logging.debug(f"Queueing {track.title}")
+        self._audio_queue.append(track)
+        in_flight_query[1] = position + 1
+        self.version += 1
 
         if not self._voice_client.is_playing():
             await self.play()
@@ -258,23 +560,54 @@ class PlaybackInstance:
     def _process_queries(self, query_queue_poll_timeout_seconds: float = 0.5) -> None:
         while not self._stop_query_worker.is_set():
             try:
-                query = self._query_queue.get(timeout=query_queue_poll_timeout_seconds)
+                query, skip = self._query_queue.get(timeout=query_queue_poll_timeout_seconds)
             except Empty:
                 continue
 
+            # Snapshots include the in-flight query, so a long playlist resumes where it left off after a crash
+            in_flight_query = [query, skip]
+            self._in_flight_query = in_flight_query
+
             # Kinda broken check for some reason. Spotify problems :(
             try:
-                for file_path, title in AudioFetcher.get_files_and_titles(query):
+                for position, track in AudioFetcher.get_tracks(query, self._loop, skip):
                     asyncio.run_coroutine_threadsafe(
-                        self._enqueue_audio(file_path, title),
-                        self._loop
-                    )
-            except Exception:
-                if not self._voice_client.is_playing() and not self._audio_queue:
-                    asyncio.run_coroutine_threadsafe(
-                        self.stop(),
+                        self._enqueue_audio(track, in_flight_query, position),
                         self._loop
                     )
+            except Exception as e:
+                logging.error(f"Failed to process query {query}: {e}")
+
+            # Scheduled after the enqueues above, so the query is only dropped once all its tracks are queued
+            asyncio.run_coroutine_threadsafe(self._finish_query(in_flight_query), self._loop)
+            self._loop.call_soon_threadsafe(self._idle_if_drained)
+
+    async def _finish_query(self, in_flight_query: list) -> None:
+        if self._in_flight_query is in_flight_query:
+            self._in_flight_query = None
+            self.version += 1
+
+    def _idle_if_drained(self) -> None:
+        if not self._voice_client.is_playing() and not self._audio_queue:
+            self._start_idle_timer()
+
+    def _start_idle_timer(self) -> None:
+        # Keep the voice connection warm for a while so the next /play skips the voice handshake
+        if self._idle_timer is not None or self.is_stopping:
+            return
+
+        logging.debug(f"Idling in {self._voice_client.channel} for {self._idle_grace_seconds} s.")
+        self._idle_timer = self._loop.call_later(self._idle_grace_seconds, self._stop_when_idle)
+
+    def _cancel_idle_timer(self) -> None:
+        if self._idle_timer is not None:
+            self._idle_timer.cancel()
+            self._idle_timer = None
+
+    def _stop_when_idle(self) -> None:
+        self._idle_timer = None
+        if self._stop_task is None:
+            self._stop_task = self._loop.create_task(self._stop())
 
     def _start_query_worker(self) -> None:
         self._stop_query_worker.clear()
@@ -290,27 +623,127 @@ class PlaybackInstance:
         self._start_query_worker()
 
     @property
-    def currently_playing(self) -> tuple[Path, str] | None:
+    def currently_playing(self) -> Track | None:
         return self._audio_queue[0] if self._audio_queue else None
 
     @property
-    def coming_up(self) -> list[tuple[Path, str]]:
+    def coming_up(self) -> list[Track]:
         return list(self._audio_queue)[1:]
 
+    @property
+    def total_duration_seconds(self) -> tuple[float, int]:
+        # (sum of the known durations, number of tracks whose duration is unknown)
+        known = 0.0
+        unknown = 0
+        for track in self._audio_queue:
+            if track.duration_seconds is None:
+                unknown += 1
+            else:
+                known += track.duration_seconds
+
+        return known, unknown
+
+    @property
+    def is_playing(self) -> bool:
+        return self._voice_client.is_playing()
+
+    @property
+    def is_idle(self) -> bool:
+        return self._idle_timer is not None
+
+    @property
+    def is_stopping(self) -> bool:
+        return self._stop_task is not None
+
+    @property
+    def is_connected(self) -> bool:
+        return self._voice_client.is_connected()
+
+    @property
+    def channel(self) -> VocalGuildChannel:
+        return self._voice_client.channel
+
+    @property
+    def position_seconds(self) -> float:
+        if self._track_started_at is None:
+            return self._track_offset_seconds
+
+        return self._track_offset_seconds + time.monotonic() - self._track_started_at
+
+    def snapshot_queue(self) -> dict:
+        pending_queries = list(self._query_queue.queue)
+        if self._in_flight_query is not None:
+            pending_queries.insert(0, tuple(self._in_flight_query))
+
+        return {
+            "saved_at": time.time(),
+            "channel_id": self._voice_client.channel.id,
+            "queue": [track.to_dict() for track in self._audio_queue],
+            "pending_queries": pending_queries,
+        }
+
+    def snapshot_position(self) -> dict:
+        current = self.currently_playing
+
+        return {
+            "saved_at": time.time(),
+            "video_id": current.video_id if current is not None else None,
+            "position_seconds": self.position_seconds,
+        }
+
+    @staticmethod
+    def _refetch(track: Track) -> Track | None:
+        if AudioFetcher.fetch(track.video_id) is None:
+            return None
+
+        return FileCache.get_track(track.video_id)
+
+    async def restore(self, snapshot: dict) -> None:
+        for index, track in enumerate(map(Track.from_dict, snapshot["queue"])):
+            if self.is_stopping or not self._voice_client.is_connected():
+                return
+
+            if track.path.is_file():
+                track = FileCache.register_track(track)
+            else:
+                # Evicted since the snapshot, fetch it again in place so the queue keeps its order
+                track = await asyncio.to_thread(self._refetch, track)
+                if track is None:
+                    continue
+
+            self._audio_queue.append(track)
+            self.version += 1
+
+            # Start as soon as the first track is available, the rest keep filling in behind it
+            if len(self._audio_queue) == 1 and not self._voice_client.is_playing():
+                await self.play(snapshot["position_seconds"] if index == 0 else 0.0)
+
+        for query, skip in snapshot["pending_queries"]:
+            self.enqueue(query, skip)
+
+        if not self._audio_queue and not snapshot["pending_queries"]:
+            self._start_idle_timer()
+
     def greet(self) -> None:
         self._voice_client.play(FFmpegPCMAudio(str(self.GREETING_AUDIO_PATH)))
 
-    def enqueue(self, query: str) ->  None:
-        self._query_queue.put(query)
+    def enqueue(self, query: str, skip: int = 0) ->  None:
+        self._cancel_idle_timer()
+        self._query_queue.put((query, skip))
 
-    async def play(self) -> None:
+    async def play(self, start_seconds: float = 0.0) -> None:
         if not self._audio_queue:
-            await self.stop()
+            self._start_idle_timer()
             return
 
-        audio_file, _ = self._audio_queue[0]
+        self._cancel_idle_timer()
+
+        audio_file = self._audio_queue[0].path
+        before_options = f"-ss {start_seconds:.2f}" if start_seconds > 0 else None
+        self._track_offset_seconds = start_seconds
+        self._track_started_at = time.monotonic()
         self._voice_client.play(
-            FFmpegPCMAudio(str(audio_file)),
+            FFmpegPCMAudio(str(audio_file), before_options=before_options),
             after=lambda e: asyncio.run_coroutine_threadsafe(
                 self._play_next(),
                 self._loop
@@ -320,6 +753,7 @@ class PlaybackInstance:
     async def _play_next(self):
         if self._audio_queue:
             self._audio_queue.popleft()
+            self.version += 1
 
         await self.play()
 
@@ -330,17 +764,28 @@ class PlaybackInstance:
         await self._voice_client.move_to(channel)
         self.greet()
 
+    async def move_to(self, channel: VocalGuildChannel) -> None:
+        await self._voice_client.move_to(channel)
+
     def pause(self) -> None:
         self._voice_client.pause()
 
+        if self._track_started_at is not None:
+            self._track_offset_seconds += time.monotonic() - self._track_started_at
+            self._track_started_at = None
+
     def resume(self) -> None:
         self._voice_client.resume()
 
+        if self._track_started_at is None:
+            self._track_started_at = time.monotonic()
+
     def skip(self, amount: int) -> int:
         amount = min(max(0, amount), len(self._audio_queue))
         for _ in range(amount - 1):  # -1 for working with play_next which skips one
             self._audio_queue.popleft()
-        
+
+        self.version += 1
         self._voice_client.stop()
         return amount
 
@@ -351,9 +796,19 @@ class PlaybackInstance:
     async def clear(self) -> None:
         self._audio_queue.clear()
         self._clear_query_queue()
+        self._in_flight_query = None
+        self.version += 1
         await self._restart_query_worker()
 
     async def stop(self) -> None:
+        # Concurrent callers (e.g. /stop racing the idle timeout) all wait for the same stop
+        if self._stop_task is None:
+            self._stop_task = self._loop.create_task(self._stop())
+
+        await asyncio.shield(self._stop_task)
+
+    async def _stop(self) -> None:
+        self._cancel_idle_timer()
         await self._terminate_query_worker()
 
         self._voice_client.stop()
@@ -376,25 +831,122 @@ class PlaybackInstance:
         self._audio_queue.clear()
         self._audio_queue.append(current)
         self._audio_queue.extend(upcoming)
+        self.version += 1
 
     def pop(self, index: int) -> str:
         if not 1 <= index < len(self._audio_queue):
             raise IndexError(f"Index {index} is invalid for audio queue of size {len(self._audio_queue)}.")
 
-        removed_title = self._audio_queue[index][1]
+        removed_title = self._audio_queue[index].title
         del self._audio_queue[index]
+        self.version += 1
 
         return removed_title
 
 
 class Audio(Cog):
+    SNAPSHOT_INTERVAL_SECONDS = 15.0
+    SNAPSHOT_MAX_AGE_SECONDS = 5 * 60  # Older sessions are not resumed, nobody is waiting for them anymore
+    # How long an instance stays connected after its queue drained, so a follow-up /play skips the reconnect
+    IDLE_GRACE_SECONDS = float(os.getenv("AUDIO_IDLE_GRACE_SECONDS") or PlaybackInstance.IDLE_GRACE_SECONDS)
+
     def __init__(self, _bot: Bot):
         self._bot = _bot
         self._playback_instances: dict[int, PlaybackInstance] = {}
+        self._snapshot_versions: dict[int, int] = {}
+        self._restored_snapshots = False
+        self._restore_tasks: set[asyncio.Task] = set()
+        self._snapshot_file_lock = Lock()  # Keeps a save in flight from recreating a deleted snapshot
 
     def _delete_playback_instance(self, guild_id: int) -> None:
-        if guild_id in self._playback_instances:
-            del self._playback_instances[guild_id]
+        with self._snapshot_file_lock:
+            if guild_id in self._playback_instances:
+                del self._playback_instances[guild_id]
+
+            self._snapshot_versions.pop(guild_id, None)
+            PlaybackSnapshots.delete(guild_id)
+
+    def cog_unload(self) -> None:
+        self._snapshot_playback.cancel()
+
+    @staticmethod
+    def _format_duration(seconds: float) -> str:
+        minutes, seconds = divmod(int(seconds), 60)
+        hours, minutes = divmod(minutes, 60)
+
+        return f"{hours}:{minutes:02}:{seconds:02}" if hours else f"{minutes}:{seconds:02}"
+
+    @tasks.loop(seconds=SNAPSHOT_INTERVAL_SECONDS)
+    async def _snapshot_playback(self) -> None:
+        # The queue is only rewritten when it changed, the position only while a track is playing
+        queue_snapshots = {}
+        position_snapshots = {}
+        for guild_id, playback_instance in self._playback_instances.items():
+            if playback_instance.version != self._snapshot_versions.get(guild_id):
+                queue_snapshots[guild_id] = (playback_instance, playback_instance.snapshot_queue())
+                self._snapshot_versions[guild_id] = playback_instance.version
+
+            if playback_instance.is_playing:
+                position_snapshots[guild_id] = (playback_instance, playback_instance.snapshot_position())
+
+        def save_snapshots() -> None:
+            with self._snapshot_file_lock:
+                # Skip sessions that stopped while this save was waiting for the thread
+                for guild_id, (playback_instance, snapshot) in queue_snapshots.items():
+                    if self._playback_instances.get(guild_id) is playback_instance:
+                        PlaybackSnapshots.save_queue(guild_id, snapshot)
+
+                for guild_id, (playback_instance, position) in position_snapshots.items():
+                    if self._playback_instances.get(guild_id) is playback_instance:
+                        PlaybackSnapshots.save_position(guild_id, position)
+
+        if queue_snapshots or position_snapshots:
+            await asyncio.to_thread(save_snapshots)
+
+    async def _restore_playback(self, guild_id: int, snapshot: dict) -> None:
+        channel = self._bot.get_channel(snapshot["channel_id"])
+        if (
+            time.time() - snapshot.get("saved_at", 0) > self.SNAPSHOT_MAX_AGE_SECONDS
+            or not snapshot["queue"] and not snapshot["pending_queries"]
+            or guild_id in self._playback_instances
+            or not isinstance(channel, VocalGuildChannel)
+            or not any(not member.bot for member in channel.members)
+        ):
+            PlaybackSnapshots.delete(guild_id)
+            return
+
+        try:
+            voice_client = await channel.connect()
+        except Exception as e:
+            logging.error(f"Failed to restore playback in guild {guild_id}: {e}")
+            PlaybackSnapshots.delete(guild_id)
+            return
+
+        if guild_id in self._playback_instances:  # /play won the race while connecting
+            return
+
+        playback_instance = self._playback_instances[guild_id] = PlaybackInstance(
+            voice_client,
+            lambda: self._delete_playback_instance(guild_id),
+            idle_grace_seconds=self.IDLE_GRACE_SECONDS
+        )
+        await playback_instance.restore(snapshot)
+        logging.info(f"Restored playback in guild {guild_id} with {len(snapshot["queue"])} tracks.")
+
+    @Cog.listener()
+    async def on_ready(self) -> None:
+        if not self._snapshot_playback.is_running():
+            self._snapshot_playback.start()
+
+        # on_ready fires again on reconnects, snapshots should only be restored once per process
+        if self._restored_snapshots:
+            return
+
+        self._restored_snapshots = True
+        for guild_id, snapshot in PlaybackSnapshots.load_all().items():
+            task = asyncio.create_task(self._restore_playback(guild_id, snapshot))
+            self._restore_tasks.add(task)
+            task.add_done_callback(self._restore_tasks.discard)
 
     @slash_command(description="Play audio.")
     async def play(
@@ -407,17 +959,24 @@ class Audio(Cog):
             await ctx.respond("You must be in a voice channel.")
             return
 
-        if ctx.guild_id not in self._playback_instances:
-            user_voice_channel = user_voice_state.channel
-            assert user_voice_channel is not None
+        user_voice_channel = user_voice_state.channel
+        assert user_voice_channel is not None
 
+        playback_instance = self._playback_instances.get(ctx.guild_id)
+        if playback_instance is not None and (playback_instance.is_stopping or not playback_instance.is_connected):
+            # The idle timeout is already tearing it down or the warm connection was dropped, start over
+            await playback_instance.stop()
+            playback_instance = None
+
+        if playback_instance is None:
             playback_instance = self._playback_instances[ctx.guild_id] = PlaybackInstance(
                 await user_voice_channel.connect(),
-                lambda: self._delete_playback_instance(ctx.guild_id)
+                lambda: self._delete_playback_instance(ctx.guild_id),
+                idle_grace_seconds=self.IDLE_GRACE_SECONDS
             )
             await playback_instance.join_channel(user_voice_channel)
-
-        playback_instance = self._playback_instances[ctx.guild_id]
+        elif playback_instance.is_idle and playback_instance.channel != user_voice_channel:
+            await playback_instance.move_to(user_voice_channel)
 
         await ctx.respond(f"Incremetally queueing audio for query: {query} ...")
         playback_instance.enqueue(query)
@@ -488,15 +1047,15 @@ class Audio(Cog):
             await ctx.respond("The queue is currently empty.")
             return
 
-        currently_playing_title = playback_instance.currently_playing[1] if playback_instance.currently_playing is not None else None
-        coming_up_titles = map(itemgetter(1), playback_instance.coming_up)
-        
-        output = [f"Now Playing: {currently_playing_title}."]
-        output.extend(f"{i}. {title}." for i, title in enumerate(coming_up_titles, 1))
+        output = [f"Now Playing: {playback_instance.currently_playing}."]
+        output.extend(f"{i}. {track}." for i, track in enumerate(playback_instance.coming_up, 1))
+        known_seconds, unknown_tracks = playback_instance.total_duration_seconds
+        total_duration = self._format_duration(known_seconds)
+        if unknown_tracks:
+            total_duration = f"≥ {total_duration}, {unknown_tracks} unknown"
+        output.append(f"Total duration: {total_duration}.")
 
-        output_str = "\n".join(output)
-        for i in range(0, len(output_str), 2000):
-            await ctx.respond(output_str[i:i + 2000])
+        await message_scheduler.respond(ctx, output)
 
     @slash_command(description="Clear the audio queue.")
     async def clear(
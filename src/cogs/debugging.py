@@ -1,6 +1,8 @@
 from discord import ApplicationContext, Bot, Cog, Member, Option, slash_command
 from discord.utils import escape_mentions
 
+from utils.outbound import message_scheduler
+
 
 class Debugging(Cog):
     def __init__(self, bot: Bot):
@@ -29,10 +31,7 @@ class Debugging(Cog):
 
             attributes.append(f"{name}={attribute}")
 
-        attribute_str = escape_mentions('\n'.join(attributes))
-
-        for chunk in (attribute_str[i:i + 2000] for i in range(0, len(attribute_str), 2000)):
-            await ctx.respond(chunk)  # Slash commands require respond(), not send()
+        await message_scheduler.respond(ctx, map(escape_mentions, attributes))
 
     @slash_command(description="Kills the bot process.")
     async def kill(self, ctx: ApplicationContext) -> None:
@@ -1,12 +1,110 @@
+import asyncio
+from datetime import datetime, timedelta
+from functools import partial
+import hashlib
+import json
+import logging
 import math
-import os
+from pathlib import Path
+import time
+from urllib.parse import parse_qs, urlparse
 
-from discord import ApplicationContext, Bot, Cog, Option, slash_command
+from discord import ApplicationContext, Bot, Cog, File, Forbidden, HTTPException, Message, NotFound, Option, slash_command
+from discord.abc import Messageable
+from discord.utils import utcnow
+
+from utils.outbound import message_scheduler
+
+
+class AttachmentCache:
+    EXPIRY_MARGIN_SECONDS = 60 * 60
+
+    def __init__(self, index_path: Path):
+        self._index_path = index_path
+        self._file_hashes: dict[Path, tuple[int, int, str]] = {}  # path -> (mtime_ns, size, sha256)
+        self._attachment_urls: dict[str, str] = {}  # sha256 -> attachment url
+        self._load()
+
+    def _load(self) -> None:
+        # Persisted so "upload once" holds across restarts, stale entries are caught by the
+        # mtime/size check and the url expiry like any in-memory entry.
+        try:
+            index = json.loads(self._index_path.read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+
+        self._file_hashes = {Path(path): tuple(entry) for path, entry in index.get("files", {}).items()}
+        self._attachment_urls = {
+            content_hash: url
+            for content_hash, url in index.get("urls", {}).items()
+            if not self._is_expired(url)
+        }
+
+    def _save(self) -> None:
+        index = {
+            "files": {str(path): list(entry) for path, entry in self._file_hashes.items()},
+            "urls": self._attachment_urls,
+        }
+
+        temporary_path = self._index_path.with_suffix(".tmp")
+        temporary_path.write_text(json.dumps(index))
+        temporary_path.replace(self._index_path)
+
+    @staticmethod
+    def _hash_file(file: Path) -> str:
+        with file.open("rb") as f:
+            return hashlib.file_digest(f, "sha256").hexdigest()
+
+    @classmethod
+    def _is_expired(cls, url: str) -> bool:
+        # Discord signs attachment urls, "ex" holds the expiry as a hex unix timestamp
+        expires = parse_qs(urlparse(url).query).get("ex")
+        if not expires:
+            return False
+
+        return int(expires[0], 16) - cls.EXPIRY_MARGIN_SECONDS < time.time()
+
+    async def content_hash(self, file: Path) -> str:
+        stat = file.stat()
+        cached = self._file_hashes.get(file)
+        if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            return cached[2]
+
+        content_hash = await asyncio.to_thread(self._hash_file, file)
+        self._file_hashes[file] = (stat.st_mtime_ns, stat.st_size, content_hash)
+
+        if cached is not None and cached[2] != content_hash:
+            self._attachment_urls.pop(cached[2], None)
+
+        self._save()
+        return content_hash
+
+    def get_url(self, content_hash: str) -> str | None:
+        url = self._attachment_urls.get(content_hash)
+        if url is None or self._is_expired(url):
+            return None
+
+        return url
+
+    def store(self, content_hash: str, url: str) -> None:
+        self._attachment_urls[content_hash] = url
+        self._save()
 
 
 class Tools(Cog):
+    MUSIC_BANK_DIR = Path("./assets/music_bank")
+    ATTACHMENT_INDEX_PATH = Path("./attachment_cache.json")
+
+    PURGE_MAX_AMOUNT = 10_000
+    BULK_DELETE_BATCH_SIZE = 100
+    BULK_DELETE_MAX_AGE = timedelta(days=14, minutes=-5)  # Margin so messages don't age out mid-request
+    SINGLE_DELETE_CONCURRENCY = 3
+    PURGE_PROGRESS_INTERVAL_SECONDS = 2.0
+    INTERACTION_TOKEN_LIFETIME_SECONDS = 14 * 60  # Discord invalidates it after 15 minutes
+
     def __init__(self, bot: Bot):
         self.bot = bot
+        self._attachment_cache = AttachmentCache(self.ATTACHMENT_INDEX_PATH)
 
     @slash_command(description="Repeats a phrase a number of times | <repetitions> <phrase>")
     async def repeat(
@@ -20,17 +118,134 @@ class Tools(Cog):
             return
 
         repetitions = min(25, repetitions)
-        for _ in range(repetitions):
-            await ctx.send(phrase)
+        message_scheduler.send(ctx.channel_id, ctx.send, (phrase for _ in range(repetitions)))
+
+        await ctx.respond(f"Repeating phrase {repetitions} times.", ephemeral=True)
+
+    @classmethod
+    async def _delete_bulk(cls, channel: Messageable, messages: list[Message], semaphore: asyncio.Semaphore) -> int:
+        try:
+            await channel.delete_messages(messages)
+        except NotFound:
+            return 0
+        except HTTPException as e:
+            if e.status != 400:
+                raise
+
+            # Discord rejects the whole batch if any message aged past the bulk delete limit
+            logging.warning(f"Bulk delete rejected ({e}), deleting {len(messages)} messages individually.")
+            results = await asyncio.gather(*(cls._delete_single(message, semaphore) for message in messages))
+            return sum(results)
+
+        return len(messages)
+
+    @staticmethod
+    async def _delete_single(message: Message, semaphore: asyncio.Semaphore) -> int:
+        async with semaphore:
+            try:
+                await message.delete()
+            except NotFound:
+                return 0
+
+        return 1
 
     @slash_command(description="Purge a number of messages | <amount>")
     async def purge(
         self,
         ctx: ApplicationContext,
-        amount: Option(int, description="Number of messages to purge")
+        amount: Option(int, description="Number of messages to purge", min_value=1)
     ) -> None:
-        await ctx.channel.purge(limit=min(32, amount + 1))
-        await ctx.respond(f"Purged {min(32, amount)} messages.", ephemeral=True)
+        await ctx.defer(ephemeral=True)
+        deferred_at = time.monotonic()
+
+        async def report(content: str, final: bool = False) -> None:
+            # Long purges outlive the interaction token, the final report then goes to the channel instead
+            if time.monotonic() - deferred_at < self.INTERACTION_TOKEN_LIFETIME_SECONDS:
+                try:
+                    await ctx.edit(content=content)
+                    return
+                except HTTPException as e:
+                    logging.warning(f"Failed to edit purge response: {e}")
+
+            if final:
+                message_scheduler.send(ctx.channel_id, ctx.channel.send, (content,))
+
+        amount = min(self.PURGE_MAX_AMOUNT, amount)
+        single_delete_semaphore = asyncio.Semaphore(self.SINGLE_DELETE_CONCURRENCY)
+
+        # Bulk deletes run one at a time per channel, single deletes share a small concurrency budget.
+        # Both overlap with streaming the history, and discord.py waits out any 429s itself.
+        deletions: list[asyncio.Task[int]] = []
+        previous_bulk_delete: asyncio.Task[int] | None = None
+        batch: list[Message] = []
+        deleted = 0
+        last_progress_update = time.monotonic()
+
+        def bulk_delete_cutoff() -> datetime:
+            return utcnow() - self.BULK_DELETE_MAX_AGE
+
+        def delete_single(message: Message) -> None:
+            deletions.append(asyncio.create_task(self._delete_single(message, single_delete_semaphore)))
+
+        async def flush_batch() -> None:
+            nonlocal previous_bulk_delete, batch
+            if previous_bulk_delete is not None:
+                await asyncio.wait((previous_bulk_delete,))
+
+            # Waiting for the previous batch can take long enough for the oldest messages to age out
+            cutoff = bulk_delete_cutoff()
+            for message in batch:
+                if message.created_at <= cutoff:
+                    delete_single(message)
+
+            fresh_messages = [message for message in batch if message.created_at > cutoff]
+            batch = []
+
+            if fresh_messages:
+                previous_bulk_delete = asyncio.create_task(
+                    self._delete_bulk(ctx.channel, fresh_messages, single_delete_semaphore)
+                )
+                deletions.append(previous_bulk_delete)
+
+        try:
+            async for message in ctx.channel.history(limit=amount):
+                if message.created_at > bulk_delete_cutoff():
+                    batch.append(message)
+                    if len(batch) == self.BULK_DELETE_BATCH_SIZE:
+                        await flush_batch()
+                else:
+                    delete_single(message)
+
+                if time.monotonic() - last_progress_update > self.PURGE_PROGRESS_INTERVAL_SECONDS:
+                    deleted = sum(task.result() for task in deletions if task.done() and not task.exception())
+                    await report(f"Purging... {deleted}/{amount} messages deleted.")
+                    last_progress_update = time.monotonic()
+
+            if batch:
+                await flush_batch()
+        except Forbidden:
+            for task in deletions:
+                task.cancel()
+
+            await report("I am not allowed to read the history of this channel.", final=True)
+            return
+
+        results = await asyncio.gather(*deletions, return_exceptions=True)
+        deleted = sum(result for result in results if isinstance(result, int))
+
+        failed = 0
+        for result in results:
+            if isinstance(result, BaseException) and not isinstance(result, Forbidden):
+                logging.error(f"Failed to delete messages in channel {ctx.channel_id}: {result!r}")
+                failed += 1
+
+        status = f"Purged {deleted} messages."
+        if failed:
+            status += f" {failed} deletion{"s" if failed != 1 else ""} failed."
+        if any(isinstance(result, Forbidden) for result in results):
+            status += " I am not allowed to delete the rest."
+
+        await report(status, final=True)
 
     @slash_command(description="Make a wave | <periods> <phrase>")
     async def wave(
@@ -52,20 +267,13 @@ class Tools(Cog):
         angle = 0
         angle_velocity = math.pi / 10
 
-        wave_part = ""
+        segments = []
 
         while angle < (2 * math.pi / b) * periods:
-            segment = f"{filler * int((a * math.sin(b * (angle + c)) + d))}{phrase}\n"
-
-            if len(wave_part) + len(segment) > 2000:
-                await ctx.send(wave_part)
-                wave_part = ""
-
-            wave_part += segment
+            segments.append(f"{filler * int((a * math.sin(b * (angle + c)) + d))}{phrase}\n")
             angle += angle_velocity
 
-        if wave_part:
-            await ctx.send(wave_part)
+        message_scheduler.send(ctx.channel_id, ctx.send, segments, separator="")
 
         await ctx.respond("Wave sent.", ephemeral=True)
 
@@ -75,8 +283,46 @@ class Tools(Cog):
         ctx: ApplicationContext
     ) -> None:
         await ctx.defer()
-        for filepath in os.scandir("../assets/music_bank"):
-            await ctx.send(file=discord.File(filepath))
+
+        files = sorted(file for file in self.MUSIC_BANK_DIR.iterdir() if file.is_file())
+        content_hashes = await asyncio.gather(*(self._attachment_cache.content_hash(file) for file in files))
+
+        cached_urls = []
+        uploads = []
+        for file, content_hash in zip(files, content_hashes):
+            url = self._attachment_cache.get_url(content_hash)
+            if url is None:
+                uploads.append((file, content_hash))
+            else:
+                cached_urls.append(url)
+
+        async def upload(file: Path, content_hash: str) -> None:
+            message = await message_scheduler.schedule(ctx.channel_id, lambda: ctx.send(file=File(file)), ordered=False)
+            self._attachment_cache.store(content_hash, message.attachments[0].url)
+
+        # Everything goes through the scheduler so the channel bucket stays accurate, uploads run concurrently.
+        link_messages = [
+            message_scheduler.schedule(ctx.channel_id, partial(ctx.send, message))
+            for message in message_scheduler.coalesce(cached_urls)
+        ]
+        results = await asyncio.gather(
+            *link_messages,
+            *(upload(file, content_hash) for file, content_hash in uploads),
+            return_exceptions=True
+        )
+
+        labels = ["cached links"] * len(link_messages) + [file.name for file, _ in uploads]
+        failed = []
+        for label, result in zip(labels, results):
+            if isinstance(result, BaseException):
+                logging.error(f"Failed to send {label}: {result!r}")
+                failed.append(label)
+
+        if failed:
+            await ctx.respond(f"Failed to send {", ".join(dict.fromkeys(failed))}.")
+            return
+
+        await ctx.respond(f"Sent {len(files)} bangers ({len(uploads)} uploaded).")
 
     @slash_command(description="Evaluate a python expression (dangerous) | <expression>")
     async def pyeval(
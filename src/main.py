@@ -4,9 +4,17 @@ from pathlib import Path
 import discord
 from dotenv import load_dotenv
 
+from utils.http import http_client
+
 COG_DIRECTORY = Path("./src/cogs")
 
 
+class Bot(discord.Bot):
+    async def close(self) -> None:
+        await http_client.close()
+        await super().close()
+
+
 def load_cogs(bot: discord.Bot) -> None:
     for filename in COG_DIRECTORY.rglob("*.py"):
         bot.load_extension(
@@ -20,7 +28,7 @@ def main() -> None:
     if token is None:
         raise RuntimeError("DISCORD_API_TOKEN is not set in .env file")
 
-    bot = discord.Bot(intents=discord.Intents.all())
+    bot = Bot(intents=discord.Intents.all())
 
     load_cogs(bot)
     bot.run(token)
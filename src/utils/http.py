@@ -0,0 +1,101 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, TypeVar
+
+from aiohttp import ClientConnectionError, ClientResponse, ClientSession, ClientTimeout, TCPConnector
+
+T = TypeVar("T")
+
+
+class HttpClient:
+    RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+    MAX_RETRY_DELAY_SECONDS = 30.0
+
+    def __init__(
+        self,
+        limit: int = 100,
+        limit_per_host: int = 10,
+        keepalive_timeout_seconds: float = 30.0,
+        timeout: ClientTimeout = ClientTimeout(total=15, connect=5),
+        retries: int = 3,
+        backoff_seconds: float = 0.5
+    ):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout_seconds = keepalive_timeout_seconds
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff_seconds = backoff_seconds
+        self._session: ClientSession | None = None
+
+    def _get_session(self) -> ClientSession:
+        # Created lazily so the session binds to the bot's running event loop.
+        if self._session is None or self._session.closed:
+            self._session = ClientSession(
+                connector=TCPConnector(
+                    limit=self.limit,
+                    limit_per_host=self.limit_per_host,
+                    keepalive_timeout=self.keepalive_timeout_seconds,
+                    ttl_dns_cache=300
+                ),
+                timeout=self.timeout
+            )
+
+        return self._session
+
+    def _retry_delay(self, attempt: int, response: ClientResponse | None = None) -> float | None:
+        # None means the server asked us to wait longer than we are willing to, so give up instead
+        if response is not None:
+            try:
+                retry_after = float(response.headers["Retry-After"])
+                return retry_after if retry_after <= self.MAX_RETRY_DELAY_SECONDS else None
+            except (KeyError, ValueError):
+                pass
+
+        return min(self.MAX_RETRY_DELAY_SECONDS, self.backoff_seconds * 2 ** attempt)
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        read: Callable[[ClientResponse], Awaitable[T]],
+        **kwargs: Any
+    ) -> T:
+        for attempt in range(self.retries + 1):
+            try:
+                async with self._get_session().request(method, url, **kwargs) as response:
+                    delay = None
+                    if response.status in self.RETRY_STATUSES and attempt < self.retries:
+                        delay = self._retry_delay(attempt, response)
+
+                    if delay is None:
+                        response.raise_for_status()
+                        return await read(response)
+
+                    logging.debug(f"{method} {url} returned {response.status}, retrying in {delay:.2f} s.")
+            except (ClientConnectionError, asyncio.TimeoutError) as e:
+                if attempt == self.retries:
+                    raise
+
+                delay = self._retry_delay(attempt)
+                logging.debug(f"{method} {url} failed with {e!r}, retrying in {delay:.2f} s.")
+
+            await asyncio.sleep(delay)
+
+        raise AssertionError("unreachable")
+
+    async def get_text(self, url: str, **kwargs: Any) -> str:
+        return await self.request("GET", url, ClientResponse.text, **kwargs)
+
+    async def get_json(self, url: str, **kwargs: Any) -> Any:
+        return await self.request("GET", url, ClientResponse.json, **kwargs)
+
+    async def post_json(self, url: str, **kwargs: Any) -> Any:
+        return await self.request("POST", url, ClientResponse.json, **kwargs)
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+
+
+http_client = HttpClient()
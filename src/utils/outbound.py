@@ -0,0 +1,212 @@
+import asyncio
+from collections import deque
+from functools import partial
+import logging
+import time
+from typing import Any, Awaitable, Callable, Iterable, TypeVar
+
+from discord import ApplicationContext, HTTPException
+
+MESSAGE_MAX_LENGTH = 2000
+
+T = TypeVar("T")
+SendFunction = Callable[[str], Awaitable[object]]
+Action = Callable[[], Awaitable[Any]]
+
+
+class RateLimitBucket:
+    def __init__(self, capacity: int, period_seconds: float):
+        self.capacity = capacity
+        self.period_seconds = period_seconds
+        self._tokens = float(capacity)
+        self._last_refill = time.monotonic()
+        self._blocked_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        refill_rate = self.capacity / self.period_seconds
+        self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * refill_rate)
+        self._last_refill = now
+
+    def delay(self) -> float:
+        now = time.monotonic()
+        self._refill(now)
+
+        if now < self._blocked_until:
+            return self._blocked_until - now
+
+        if self._tokens >= 1:
+            return 0.0
+
+        return (1 - self._tokens) * self.period_seconds / self.capacity
+
+    def consume(self) -> None:
+        self._refill(time.monotonic())
+        self._tokens -= 1
+
+    def block(self, seconds: float) -> None:
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+        self._tokens = 0.0
+
+
+class MessageScheduler:
+    CHANNEL_RATE_LIMIT = (5, 5.0)  # Discord allows 5 messages per 5 seconds per channel
+    GLOBAL_RATE_LIMIT = (50, 1.0)
+    RATE_LIMITED_BACKOFF_SECONDS = 5.0
+
+    def __init__(self):
+        self._queues: dict[int, deque[tuple[Action, asyncio.Future, bool]]] = {}
+        self._blocked_channels: set[int] = set()  # Channels with an ordered send in flight
+        self._buckets: dict[int, RateLimitBucket] = {}
+        self._global_bucket = RateLimitBucket(*self.GLOBAL_RATE_LIMIT)
+        self._ready_channels: deque[int] = deque()
+        self._wakeup = asyncio.Event()
+        self._worker: asyncio.Task | None = None
+        self._send_tasks: set[asyncio.Task] = set()
+
+    @staticmethod
+    def coalesce(parts: Iterable[str], separator: str = "\n", limit: int = MESSAGE_MAX_LENGTH) -> list[str]:
+        messages = []
+        current = ""
+
+        for part in parts:
+            candidate = f"{current}{separator}{part}" if current else part
+            if len(candidate) <= limit:
+                current = candidate
+                continue
+
+            if current:
+                messages.append(current)
+
+            while len(part) > limit:
+                messages.append(part[:limit])
+                part = part[limit:]
+
+            current = part
+
+        if current:
+            messages.append(current)
+
+        return messages
+
+    def schedule(
+        self,
+        channel_id: int,
+        action: Callable[[], Awaitable[T]],
+        ordered: bool = True
+    ) -> asyncio.Future[T]:
+        # Unordered actions (e.g. file uploads) still consume rate limit tokens but don't wait for the
+        # previous send in the channel to finish, so several of them can be in flight at once.
+        future = asyncio.get_running_loop().create_future()
+
+        self._queues.setdefault(channel_id, deque()).append((action, future, ordered))
+        self._buckets.setdefault(channel_id, RateLimitBucket(*self.CHANNEL_RATE_LIMIT))
+        self._make_ready(channel_id)
+
+        self._ensure_worker()
+        self._wakeup.set()
+
+        return future
+
+    @staticmethod
+    def _discard_result(future: asyncio.Future) -> None:
+        # Failures are already logged by _send, this only marks the exception as retrieved
+        if not future.cancelled():
+            future.exception()
+
+    def submit(self, channel_id: int, send: SendFunction, messages: Iterable[str]) -> int:
+        messages = [message for message in messages if message]
+
+        for message in messages:
+            self.schedule(channel_id, partial(send, message)).add_done_callback(self._discard_result)
+
+        return len(messages)
+
+    def send(self, channel_id: int, send: SendFunction, parts: Iterable[str], separator: str = "\n") -> int:
+        return self.submit(channel_id, send, self.coalesce(parts, separator))
+
+    async def respond(self, ctx: ApplicationContext, parts: Iterable[str], separator: str = "\n") -> int:
+        messages = self.coalesce(parts, separator)
+        if not messages:
+            return 0
+
+        # The interaction has to be acknowledged right away, the rest are sent as followups.
+        await ctx.respond(messages[0])
+        return 1 + self.submit(ctx.channel_id, ctx.followup.send, messages[1:])
+
+    def _make_ready(self, channel_id: int) -> None:
+        if channel_id in self._blocked_channels or channel_id in self._ready_channels:
+            return
+
+        if self._queues.get(channel_id):
+            self._ready_channels.append(channel_id)
+            self._wakeup.set()
+        else:
+            self._queues.pop(channel_id, None)
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            delay = self._dispatch_ready()
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except TimeoutError:
+                pass
+
+    def _dispatch_ready(self) -> float | None:
+        next_delay: float | None = None
+
+        # Round robin over channels, one message per channel per pass, so a long
+        # backlog in one channel never starves the others.
+        for _ in range(len(self._ready_channels)):
+            channel_id = self._ready_channels.popleft()
+            delay = max(self._buckets[channel_id].delay(), self._global_bucket.delay())
+
+            if delay > 0:
+                self._ready_channels.append(channel_id)
+                next_delay = delay if next_delay is None else min(next_delay, delay)
+                continue
+
+            self._buckets[channel_id].consume()
+            self._global_bucket.consume()
+
+            action, future, ordered = self._queues[channel_id].popleft()
+            task = asyncio.create_task(self._send(channel_id, action, future, ordered))
+            self._send_tasks.add(task)
+            task.add_done_callback(self._send_tasks.discard)
+
+            # Ordered sends keep the channel out of rotation until they finish
+            if ordered:
+                self._blocked_channels.add(channel_id)
+            else:
+                self._make_ready(channel_id)
+
+        return next_delay
+
+    async def _send(self, channel_id: int, action: Action, future: asyncio.Future, ordered: bool) -> None:
+        try:
+            future.set_result(await action())
+        except HTTPException as e:
+            if e.status == 429:
+                logging.warning(f"Rate limited in channel {channel_id}, backing off.")
+                self._buckets[channel_id].block(self.RATE_LIMITED_BACKOFF_SECONDS)
+                self._queues.setdefault(channel_id, deque()).appendleft((action, future, ordered))
+            else:
+                logging.error(f"Failed to send message to channel {channel_id}: {e}")
+                future.set_exception(e)
+        except Exception as e:
+            logging.error(f"Failed to send message to channel {channel_id}: {e}")
+            future.set_exception(e)
+        finally:
+            if ordered:
+                self._blocked_channels.discard(channel_id)
+
+            self._make_ready(channel_id)
+            self._wakeup.set()
+
+
+message_scheduler = MessageScheduler()
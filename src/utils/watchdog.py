@@ -0,0 +1,154 @@
+import asyncio
+import cProfile
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+import io
+import logging
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+import traceback
+
+
+@dataclass(frozen=True)
+class Stall:
+    timestamp: datetime
+    duration_seconds: float
+    stack: str
+
+
+class LoopWatchdog:
+    def __init__(
+        self,
+        interval_seconds: float = 0.25,
+        stall_threshold_seconds: float = 0.5,
+        max_samples: int = 240,
+        max_stalls: int = 20
+    ):
+        self.interval_seconds = interval_seconds
+        self.stall_threshold_seconds = stall_threshold_seconds
+        self.stalls: deque[Stall] = deque(maxlen=max_stalls)
+        self._lag_samples: deque[float] = deque(maxlen=max_samples)
+        self._last_beat = time.monotonic()
+        self._loop_thread_id: int | None = None
+        self._lag_task: asyncio.Task | None = None
+        self._monitor_td: threading.Thread | None = None
+        self._stop_monitor = threading.Event()
+        self._profiling_lock = asyncio.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._lag_task is not None and not self._lag_task.done()
+
+    @property
+    def current_lag(self) -> float:
+        return self._lag_samples[-1] if self._lag_samples else 0.0
+
+    @property
+    def max_lag(self) -> float:
+        return max(self._lag_samples, default=0.0)
+
+    @property
+    def mean_lag(self) -> float:
+        return sum(self._lag_samples) / len(self._lag_samples) if self._lag_samples else 0.0
+
+    def start(self) -> None:
+        if self.running:
+            return
+
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._lag_task = asyncio.get_running_loop().create_task(self._measure_lag())
+
+        self._stop_monitor.clear()
+        self._monitor_td = threading.Thread(target=self._monitor, daemon=True)
+        self._monitor_td.start()
+
+    def stop(self) -> None:
+        if self._lag_task is not None:
+            self._lag_task.cancel()
+
+        self._stop_monitor.set()
+
+    async def _measure_lag(self) -> None:
+        while True:
+            start = time.monotonic()
+            await asyncio.sleep(self.interval_seconds)
+            now = time.monotonic()
+
+            self._lag_samples.append(max(0.0, now - start - self.interval_seconds))
+            self._last_beat = now
+
+    def _capture_loop_stack(self) -> str:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return "<event loop thread not found>"
+
+        return "".join(traceback.format_stack(frame))
+
+    def _monitor(self) -> None:
+        # Runs in its own thread so it can still observe the event loop while the loop is blocked.
+        captured_beat: float | None = None
+
+        while not self._stop_monitor.wait(self.interval_seconds):
+            beat = self._last_beat
+            stalled_for = time.monotonic() - beat - self.interval_seconds
+
+            if stalled_for < self.stall_threshold_seconds or beat == captured_beat:
+                continue
+
+            stall = Stall(datetime.now(), stalled_for, self._capture_loop_stack())
+            self.stalls.append(stall)
+            captured_beat = beat
+
+            logging.warning(f"Event loop blocked for at least {stalled_for:.2f} s:\n{stall.stack}")
+
+    def format_stalls(self) -> str:
+        return "\n".join(
+            f"{stall.timestamp:%Y-%m-%d %H:%M:%S} blocked for at least {stall.duration_seconds:.2f} s\n{stall.stack}"
+            for stall in self.stalls
+        )
+
+    @property
+    def profiling(self) -> bool:
+        return self._profiling_lock.locked()
+
+    async def profile_cpu(self, duration_seconds: float, max_entries: int = 50) -> str:
+        async with self._profiling_lock:
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                await asyncio.sleep(duration_seconds)
+            finally:
+                profiler.disable()
+
+        output = io.StringIO()
+        pstats.Stats(profiler, stream=output).sort_stats(pstats.SortKey.CUMULATIVE).print_stats(max_entries)
+
+        return output.getvalue()
+
+    async def profile_memory(self, duration_seconds: float, max_entries: int = 50) -> str:
+        async with self._profiling_lock:
+            already_tracing = tracemalloc.is_tracing()
+            if not already_tracing:
+                tracemalloc.start(25)
+
+            try:
+                before = tracemalloc.take_snapshot()
+                await asyncio.sleep(duration_seconds)
+                after = tracemalloc.take_snapshot()
+            finally:
+                if not already_tracing:
+                    tracemalloc.stop()
+
+        differences = await asyncio.to_thread(after.compare_to, before, "traceback")
+
+        output = [f"Top {max_entries} allocation differences over {duration_seconds:.1f} s:"]
+        for difference in differences[:max_entries]:
+            output.append(str(difference))
+            output.extend(f"    {line}" for line in difference.traceback.format())
+
+        return "\n".join(output)
@@ -0,0 +1,129 @@
+import argparse
+import asyncio
+from dataclasses import dataclass
+import logging
+from pathlib import Path
+import time
+
+from cogs.audio import AudioFetcher, FileCache
+from utils.http import http_client
+
+
+@dataclass
+class WarmupStats:
+    resolved: int = 0
+    already_cached: int = 0
+    downloaded: int = 0
+    failed: int = 0
+    downloaded_bytes: int = 0
+
+
+async def expand(query: str) -> list[str]:
+    try:
+        return await AudioFetcher.expand_collection(query)
+    except Exception as e:
+        logging.error(f"Failed to expand {query}: {e}")
+        return []
+
+
+async def resolve(query: str, budget: asyncio.Semaphore) -> list[str]:
+    loop = asyncio.get_running_loop()
+
+    async with budget:
+        try:
+            return await asyncio.to_thread(lambda: list(AudioFetcher.search(query, loop)))
+        except Exception as e:
+            logging.error(f"Failed to resolve {query}: {e}")
+            return []
+
+
+async def warm(video_id: str, budget: asyncio.Semaphore, stats: WarmupStats) -> None:
+    if FileCache.get_file(fr"*{video_id}*") is not None:
+        stats.already_cached += 1
+        return
+
+    async with budget:
+        try:
+            file = await asyncio.to_thread(AudioFetcher.fetch, video_id)
+        except Exception as e:
+            logging.error(f"Failed to download {video_id}: {e}")
+            file = None
+
+    if file is None:
+        stats.failed += 1
+        return
+
+    stats.downloaded += 1
+    stats.downloaded_bytes += file.stat().st_size
+    logging.info(f"Cached {file.name}")
+
+
+async def warmup(queries: list[str], jobs: int) -> WarmupStats:
+    # Resolving and downloading share one budget so yt-dlp never runs more than `jobs` times at once
+    budget = asyncio.Semaphore(jobs)
+    stats = WarmupStats()
+    seen_video_ids: set[str] = set()
+    downloads: list[asyncio.Task[None]] = []
+
+    async def resolve_and_warm(query: str) -> None:
+        # Downloads start as soon as their ids are known instead of after every query resolved
+        for video_id in await resolve(query, budget):
+            if video_id in seen_video_ids:
+                continue
+
+            seen_video_ids.add(video_id)
+            stats.resolved += 1
+            downloads.append(asyncio.create_task(warm(video_id, budget, stats)))
+
+    try:
+        expanded = await asyncio.gather(*(expand(query) for query in queries))
+        await asyncio.gather(*(resolve_and_warm(query) for sub_queries in expanded for query in sub_queries))
+    finally:
+        await http_client.close()
+
+    logging.info(f"Resolved {len(queries)} queries to {stats.resolved} tracks.")
+    await asyncio.gather(*downloads)
+
+    return stats
+
+
+def read_queries(args: argparse.Namespace) -> list[str]:
+    queries = list(args.queries)
+
+    if args.file is not None:
+        lines = args.file.read_text().splitlines()
+        queries.extend(line.strip() for line in lines if line.strip() and not line.startswith("#"))
+
+    return queries
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Download audio into the file cache ahead of time.")
+    parser.add_argument("queries", nargs="*", help="YouTube or Spotify URLs, or search queries")
+    parser.add_argument("-f", "--file", type=Path, help="File with one query per line")
+    parser.add_argument("-j", "--jobs", type=int, default=4, help="Maximum number of concurrent yt-dlp jobs")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        format="%(asctime)s - %(levelname)s - %(message)s",
+        level=logging.INFO
+    )
+
+    queries = read_queries(args)
+    if not queries:
+        parser.error("No queries given")
+
+    start = time.monotonic()
+    stats = asyncio.run(warmup(queries, max(1, args.jobs)))
+    elapsed = time.monotonic() - start
+
+    logging.info(
+        f"Warmed {stats.resolved} tracks in {elapsed:.1f} s: "
+        f"{stats.downloaded} downloaded, {stats.already_cached} already cached, {stats.failed} failed. "
+        f"{stats.downloaded_bytes / 1024 ** 2:.1f} MiB at {stats.downloaded_bytes / 1024 ** 2 / elapsed:.2f} MiB/s, "
+        f"{stats.downloaded / elapsed:.2f} tracks/s."
+    )
+
+
+if __name__ == "__main__":
+    main()